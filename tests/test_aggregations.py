@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from weatherlyser import aggregations
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_get_daily_temperature_stats(dtype: str) -> None:
+    time = pd.date_range("2022-01-01", periods=48, freq="H", tz="UTC", name="time")
+    index = pd.MultiIndex.from_product(
+        [time, ["era5", "cerra"]], names=["time", "model"]
+    )
+    df = pd.DataFrame(
+        {"temperature_2m": np.arange(len(index), dtype=dtype) / 10}, index=index
+    )
+    stats = aggregations.get_daily_temperature_stats(df)
+    assert stats.index.names == ["date", "model"]
+    assert len(stats) == 4
+    assert stats.loc[
+        (pd.Timestamp("2022-01-01", tz="UTC"), "era5"), "temperature_2m_max"
+    ] == pytest.approx(4.6)
+
+
+def test_get_daily_temperature_stats_missing_days() -> None:
+    time = pd.date_range("2022-01-01", periods=24 * 4, freq="H", tz="UTC", name="time")
+    index = pd.MultiIndex.from_product(
+        [time, ["era5", "cerra"]], names=["time", "model"]
+    )
+    df = pd.DataFrame(
+        {"temperature_2m": np.ones(len(index), dtype="float32")}, index=index
+    )
+    # era5 has no data on 2022-01-02 and 2022-01-03
+    day = df.index.get_level_values("time").day
+    df = df[~(day.isin([2, 3]) & (df.index.get_level_values("model") == "era5"))]
+
+    stats = aggregations.get_daily_temperature_stats(df)
+    assert len(stats) == 8
+    assert stats.xs("era5", level="model")["temperature_2m_mean"].isna().to_list() == [
+        False,
+        True,
+        True,
+        False,
+    ]
@@ -1,8 +1,10 @@
 import pathlib
+
+import openpyxl
 import pandera.errors
 import pytest
 
-from weatherlyser import loader
+from weatherlyser import loader, pa_models
 
 RUZYNE_PATH = pathlib.Path(__file__).parent / "data" / "P1PRUZ01.xlsx"
 RUZYNE_CORRUPT_PATH = pathlib.Path(__file__).parent / "data" / "P1PRUZ01corrupt.xlsx"
@@ -18,3 +20,38 @@ def test_load_chmi() -> None:
 def test_load_chmi_pa_validate_error() -> None:
     with pytest.raises(pandera.errors.SchemaError):
         loader.load_chmi_data(RUZYNE_CORRUPT_PATH)
+
+
+def test_load_chmi_validation_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(pa_models, "VALIDATE", False)
+    df = loader.load_chmi_data(RUZYNE_CORRUPT_PATH)
+    assert not df.empty
+
+
+def _write_chmi_workbook(path: pathlib.Path, first_day_value: object) -> None:
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "geografie stanice"
+    for sheet_name in loader.CZ_EN_TRANSLATION:
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append([sheet_name])
+        sheet.append(["stanice: P1PRUZ01"])
+        sheet.append([])
+        sheet.append(["rok", "měsíc", *loader.CHMI_DAY_COLUMNS])
+        sheet.append(["2022", "02", first_day_value, *[1.5] * 27, None, None, None])
+    workbook.save(path)
+
+
+def test_load_chmi_values(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "chmi.xlsx"
+    _write_chmi_workbook(path, -1.9)
+    df = loader.load_chmi_data(path)
+    # 28 days of February, values are not rounded through float32
+    assert len(df) == 28
+    assert df["average_temperature"].iloc[0] == -1.9
+
+
+def test_load_chmi_invalid_cell(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "chmi.xlsx"
+    _write_chmi_workbook(path, "n/a")
+    with pytest.raises(pandera.errors.SchemaError):
+        loader.load_chmi_data(path)
@@ -0,0 +1,93 @@
+import asyncio
+import datetime as dt
+import pathlib
+from typing import Any
+
+import httpx
+import pytest
+
+from weatherlyser import api_models, loader
+
+
+def _query_parameters(month: int) -> api_models.ArchiveQueryParameters:
+    return api_models.ArchiveQueryParameters(
+        latitude=50.1,
+        longitude=14.3,
+        hourly=["temperature_2m"],
+        start_date=dt.date(2022, month, 1),
+        end_date=dt.date(2022, month, 2),
+    )
+
+
+QUERIES = [_query_parameters(month) for month in (1, 2, 3)]
+
+
+class FakeArchiveAPI:
+    """Answers archive requests and records their start dates"""
+
+    def __init__(self) -> None:
+        self.requested: list[str] = []
+        self.failing: set[str] = set()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        start_date = request.url.params["start_date"]
+        self.requested.append(start_date)
+        if start_date in self.failing:
+            return httpx.Response(500)
+        return httpx.Response(
+            200,
+            json={
+                "utc_offset_seconds": 0,
+                "hourly": {"time": [f"{start_date}T00:00"], "temperature_2m": [1.5]},
+            },
+        )
+
+
+@pytest.fixture
+def api(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> FakeArchiveAPI:
+    api = FakeArchiveAPI()
+    async_client = httpx.AsyncClient
+
+    def fake_async_client(**kwargs: Any) -> httpx.AsyncClient:
+        return async_client(transport=httpx.MockTransport(api), **kwargs)
+
+    monkeypatch.setattr(loader, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(httpx, "AsyncClient", fake_async_client)
+    monkeypatch.setattr(
+        loader, "_CLIENT", httpx.Client(transport=httpx.MockTransport(api))
+    )
+    return api
+
+
+def test_batch_caches_responses(api: FakeArchiveAPI) -> None:
+    responses = list(loader.load_open_meteo_archive_data_batch(QUERIES))
+    assert [response.hourly["time"] for response in responses] == [  # type: ignore
+        ["2022-01-01T00:00"],
+        ["2022-02-01T00:00"],
+        ["2022-03-01T00:00"],
+    ]
+    assert sorted(api.requested) == ["2022-01-01", "2022-02-01", "2022-03-01"]
+
+    # both the batch and the single query loader are served from the cache
+    assert list(loader.load_open_meteo_archive_data_batch(QUERIES)) == responses
+    assert loader.load_open_meteo_archive_data(QUERIES[1]) == responses[1]
+    assert len(api.requested) == 3
+
+
+def test_batch_caches_successful_responses_on_failure(api: FakeArchiveAPI) -> None:
+    api.failing.add("2022-02-01")
+    with pytest.raises(httpx.HTTPStatusError):
+        loader.load_open_meteo_archive_data_batch(QUERIES)
+
+    api.failing.clear()
+    api.requested.clear()
+    loader.load_open_meteo_archive_data_batch(QUERIES)
+    assert api.requested == ["2022-02-01"]
+
+
+def test_batch_in_running_event_loop(api: FakeArchiveAPI) -> None:
+    async def load() -> list[api_models.V1ArchiveGetResponse]:
+        # e.g. a Jupyter notebook, where asyncio.run cannot be used directly
+        return list(loader.load_open_meteo_archive_data_batch(QUERIES))
+
+    assert len(asyncio.run(load())) == 3
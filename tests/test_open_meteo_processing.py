@@ -1,3 +1,4 @@
+import functools
 import pathlib
 
 import hypothesis
@@ -5,12 +6,22 @@ import pandas as pd
 import pandera.errors
 import pytest
 
-from weatherlyser import processors
+from weatherlyser import api_models, processors
+
+
+@functools.lru_cache(maxsize=None)
+def _open_meteo_df_strategy(
+    n_regex_columns: int, size: int | None
+) -> hypothesis.strategies.SearchStrategy:
+    # building the strategy from the regex schema is not cheap, share it between tests
+    return processors.open_meteo_df_schema.strategy(
+        n_regex_columns=n_regex_columns, size=size
+    )
 
 
 class TestTidyOpenMeteoDataframe:
     @hypothesis.given(
-        df=processors.open_meteo_df_schema.strategy(n_regex_columns=2, size=None),
+        df=_open_meteo_df_strategy(n_regex_columns=2, size=None),
     )
     @hypothesis.example(
         pd.read_parquet(
@@ -28,20 +39,37 @@ class TestTidyOpenMeteoDataframe:
     def test_valid_schema(self, df: pd.DataFrame) -> None:
         processors.tidy_open_meteo_dataframe(df)
 
-    @hypothesis.given(
-        df=processors.open_meteo_df_schema.strategy(n_regex_columns=1, size=2)
-    )
+    @hypothesis.given(df=_open_meteo_df_strategy(n_regex_columns=1, size=2))
     @hypothesis.settings(max_examples=2)
     def test_invalid_index(self, df: pd.DataFrame) -> None:
         df = df.reset_index(drop=True)
         with pytest.raises(pandera.errors.SchemaError):
             processors.tidy_open_meteo_dataframe(df)
 
-    @hypothesis.given(
-        df=processors.open_meteo_df_schema.strategy(n_regex_columns=1, size=2)
-    )
+    @hypothesis.given(df=_open_meteo_df_strategy(n_regex_columns=1, size=2))
     @hypothesis.settings(max_examples=2)
     def test_invalid_columns(self, df: pd.DataFrame) -> None:
         df = df.assign(invalid_column=1.23)
         with pytest.raises(pandera.errors.SchemaError):
             processors.tidy_open_meteo_dataframe(df)
+
+
+class TestOpenMeteoResponseToDataframe:
+    @pytest.mark.parametrize("suffix", ["", "_era5"])
+    def test_dtypes(self, suffix: str) -> None:
+        response = api_models.V1ArchiveGetResponse(
+            utc_offset_seconds=0,
+            hourly={
+                "time": ["2022-01-01T00:00", "2022-01-01T01:00"],
+                f"temperature_2m{suffix}": [1.5, None],
+                f"is_day{suffix}": [0, 1],
+                f"weathercode{suffix}": [3, None],
+            },
+        )
+        df = processors.open_meteo_response_to_dataframe(response)
+        assert df.dtypes.to_dict() == {
+            f"temperature_2m{suffix}": "float32",
+            f"is_day{suffix}": "int64",
+            f"weathercode{suffix}": "float64",
+        }
+        assert str(df.index.tz) == "UTC"
@@ -7,8 +7,10 @@ import pytest
 
 from weatherlyser import pa_models, processors
 
+CHMI_DAILY_STRATEGY = pa_models.CHMIDailyDataFrame.strategy()
 
-@given(data=pa_models.CHMIDailyDataFrame.strategy())
+
+@given(data=CHMI_DAILY_STRATEGY)
 def test_get_seasons(data: pd.DataFrame) -> None:
     seasons = processors.get_seasons(data.index)
     assert seasons.isin(["winter", "spring", "summer", "autumn"]).all()
@@ -49,3 +51,21 @@ def test_seasons_series_schema_valid(valid_seasons: pd.Series) -> None:
 def test_seasons_series_schema_invalid(invalid_seasons: pd.Series) -> None:
     with pytest.raises(pandera.errors.SchemaError):
         processors.seasons_series_schema.validate(invalid_seasons)
+
+
+def test_get_seasons_months() -> None:
+    index = pd.date_range("2022-01-01", periods=12, freq="MS")
+    seasons = processors.get_seasons(index)
+    assert seasons.to_list() == [
+        *["winter"] * 2,
+        *["spring"] * 3,
+        *["summer"] * 3,
+        *["autumn"] * 3,
+        "winter",
+    ]
+
+
+def test_get_seasons_nat() -> None:
+    index = pd.DatetimeIndex([dt.datetime(2022, 1, 1), pd.NaT])
+    with pytest.raises(pandera.errors.SchemaError):
+        processors.get_seasons(index)
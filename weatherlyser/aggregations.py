@@ -1,35 +1,53 @@
+import numpy as np
+import pandas as pd
 import pandera as pa
 
-from pandera import Float
+from pandera import Float32
 from pandera.typing import DataFrame
 
+from weatherlyser import pa_models
+
 
 class TemperatureModel(pa.DataFrameModel):
-    temperature_2m: Float = pa.Field(ge=-100, le=100, nullable=True)
+    temperature_2m: Float32 = pa.Field(ge=-100, le=100, nullable=True, coerce=True)
     # time: Index[Annotated[pd.DatetimeTZDtype, "ns", "UTC"]]
 
 
 class DailyTemperatureModel(pa.DataFrameModel):
-    temperature_2m_min: Float = pa.Field(nullable=True)
-    temperature_2m_mean: Float = pa.Field(nullable=True)
-    temperature_2m_max: Float = pa.Field(nullable=True)
+    temperature_2m_min: Float32 = pa.Field(nullable=True)
+    temperature_2m_mean: Float32 = pa.Field(nullable=True)
+    temperature_2m_max: Float32 = pa.Field(nullable=True)
 
     # time: Dat[Annotated[pd.DatetimeTZDtype, "ns", "UTC"]]
 
 
-@pa.check_types
+@pa_models.maybe_check_types
 def get_daily_temperature_stats(df: DataFrame[TemperatureModel]) -> DataFrame[DailyTemperatureModel]:
     # Note: We will need this in further analyses
     df = (
         df
-        .reset_index(level="model")
-        .groupby("model")
-        .resample("D")
+        .groupby([pd.Grouper(level="time", freq="D"), pd.Grouper(level="model")])
         ["temperature_2m"]
         .agg(["min", "mean", "max"])
         .rename(columns = lambda n: f"temperature_2m_{n}")
-        .reorder_levels(["time", "model"])
-        .sort_index()
+        .rename_axis(index=["date", "model"])
+    )
+    # Like resample, keep a (NaN) row for every day in the range of each model
+    return df.reindex(_daily_index(df.index)).sort_index()
+
+
+def _daily_index(index: pd.MultiIndex) -> pd.MultiIndex:
+    """(date, model) index with all days between the first and last date of a model"""
+    bounds = index.to_frame(index=False).groupby("model")["date"].agg(["min", "max"])
+    days = [
+        pd.date_range(start, end, freq="D")
+        for start, end in bounds.itertuples(index=False)
+    ]
+    return pd.MultiIndex.from_arrays(
+        [
+            # appending to an empty date level keeps its dtype (and works for no days)
+            index.levels[0][:0].append(days),
+            np.repeat(bounds.index, [len(d) for d in days]),
+        ],
+        names=index.names,
     )
-    df = df.set_index(df.index.rename(["date", "model"]))
-    return df
@@ -3,18 +3,23 @@
 This module is not to be modified during the workshop.
 """
 
-import gzip
+import asyncio
 import hashlib
 import json
 import pathlib
-import pickle
-from functools import wraps
+from collections.abc import Coroutine, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce, wraps
 from typing import Any, Callable, ParamSpec, TypeVar
 
 import httpx
+import numpy as np
+import orjson
 import pandas as pd
-import pandera as pa
+import zstandard
 from pandera.typing import DataFrame
+from pydantic import BaseModel
+from python_calamine import CalamineWorkbook
 
 from weatherlyser import api_models, pa_models
 
@@ -23,32 +28,71 @@ CACHE_DIR.mkdir(exist_ok=True)
 
 ARCHIVE_URI = "https://archive-api.open-meteo.com/v1/archive"
 
+# Maximum number of API requests in flight at once
+MAX_CONCURRENT_REQUESTS = 8
+# Timeout of a single (possibly large) archive request in seconds
+REQUEST_TIMEOUT = 60
+
+# A shared client reuses connections across requests (e.g. chunks of a longer period);
+# httpx asks for compressed responses (gzip, deflate) and decodes them transparently
+_CLIENT = httpx.Client(http2=True, timeout=REQUEST_TIMEOUT)
+
 
 P = ParamSpec("P")
 T = TypeVar("T")
 
 
+def _json_default(obj: Any) -> Any:
+    # pydantic models (e.g. query parameters) are keyed by their fields
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    return str(obj)
+
+
+def _cache_filepath(func_name: str, args: tuple, kwargs: dict) -> pathlib.Path:
+    """Cache file for a call, unique for the function name and arguments
+
+    The key is a hash of canonical JSON, which (unlike pickle) is stable
+    across Python and library versions.
+    """
+    key_source = json.dumps(
+        {"fn": func_name, "args": args, "kwargs": kwargs},
+        sort_keys=True,
+        default=_json_default,
+    ).encode()
+    key = hashlib.blake2b(key_source, digest_size=16).hexdigest()
+    return CACHE_DIR / f"{func_name}_{key}.json.zst"
+
+
+# Cache files may be shared (see httpx_get_json), so they are zstd-compressed JSON
+# rather than pickles, which could execute arbitrary code when loaded
+def _read_cache(filepath: pathlib.Path) -> Any:
+    return orjson.loads(zstandard.ZstdDecompressor().decompress(filepath.read_bytes()))
+
+
+def _write_cache(filepath: pathlib.Path, result: Any) -> None:
+    filepath.write_bytes(
+        zstandard.ZstdCompressor(level=3).compress(orjson.dumps(result))
+    )
+
+
 def memoize_to_file(func: Callable[P, T]) -> Callable[P, T]:
     """Memoize function results to file
 
     This helps us save results locally so we do not put too much load on the API.
     """
+
     @wraps(func)
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
-        # Create a unique file name based on the function name and arguments
-        key = hashlib.md5(pickle.dumps((func.__name__, args, kwargs))).hexdigest()
-
-        filepath = CACHE_DIR / f"{func.__name__}_{key}.json.gz"
+        filepath = _cache_filepath(func.__name__, args, kwargs)
 
         # Check if the file already exists and return the cached result if it does
         if filepath.exists():
-            with gzip.open(filepath, "rb") as f:
-                return json.load(f)
+            return _read_cache(filepath)
 
         # Call the function and store the result in a file
         result = func(*args, **kwargs)
-        with gzip.open(filepath, "wt") as f:
-            json.dump(result, f)
+        _write_cache(filepath, result)
 
         return result
 
@@ -61,9 +105,47 @@ def httpx_get_json(uri: str, params: dict) -> Any:
 
     Cache data can be provided upfront to save the number of API calls.
     """
-    response = httpx.get(uri, params=params)
+    response = _CLIENT.get(uri, params=params)
     response.raise_for_status()
-    return response.json()
+    return orjson.loads(response.content)
+
+
+async def _httpx_get_json_all(
+    uri: str, params_list: list[dict], filepaths: list[pathlib.Path]
+) -> None:
+    """Issue the requests concurrently and write the results to filepaths
+
+    Every result is written to its cache file as soon as it arrives, so that a
+    failing request does not discard the ones that succeeded.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async with httpx.AsyncClient(http2=True, timeout=REQUEST_TIMEOUT) as client:
+
+        async def get_json(params: dict, filepath: pathlib.Path) -> None:
+            async with semaphore:
+                response = await client.get(uri, params=params)
+            response.raise_for_status()
+            _write_cache(filepath, orjson.loads(response.content))
+
+        results = await asyncio.gather(
+            *(get_json(*args) for args in zip(params_list, filepaths)),
+            return_exceptions=True,
+        )
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+def _run_coroutine(coroutine: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion, also from within a running event loop (e.g. Jupyter)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
 
 
 def load_open_meteo_archive_data(
@@ -81,6 +163,39 @@ def load_open_meteo_archive_data(
     return api_models.V1ArchiveGetResponse.parse_obj(data)
 
 
+def load_open_meteo_archive_data_batch(
+    params_list: Iterable[api_models.ArchiveQueryParameters],
+) -> Iterator[api_models.V1ArchiveGetResponse]:
+    """Load data for several queries from the archive API
+
+    Queries missing in the cache are requested concurrently upfront. The responses
+    are then read from the cache one at a time, so that only a single one is held
+    in memory. The cache is shared with `httpx_get_json`,
+    i.e. with `load_open_meteo_archive_data`.
+    """
+    query_params = [params.dict(exclude_unset=True) for params in params_list]
+    filepaths = [
+        _cache_filepath(httpx_get_json.__name__, (ARCHIVE_URI,), {"params": params})
+        for params in query_params
+    ]
+
+    missing = [i for i, filepath in enumerate(filepaths) if not filepath.exists()]
+    if missing:
+        # The results are in the cache files now, no need to keep them
+        _run_coroutine(
+            _httpx_get_json_all(
+                ARCHIVE_URI,
+                [query_params[i] for i in missing],
+                [filepaths[i] for i in missing],
+            )
+        )
+
+    return (
+        api_models.V1ArchiveGetResponse.parse_obj(_read_cache(filepath))
+        for filepath in filepaths
+    )
+
+
 CZ_EN_TRANSLATION = {
     "teplota průměrná": "average temperature",
     "teplota maximální": "maximum temperature",
@@ -96,44 +211,107 @@ CZ_EN_TRANSLATION = {
 
 DEFAULT_CHMI_DATA_PATH = pathlib.Path(__file__).parent.parent / "data" / "P1PRUZ01.xlsx"
 
+
 # Solution to exercise in Data loading module
-@pa.check_types
+@pa_models.maybe_check_types
 def load_chmi_data(
     path: str | pathlib.Path = DEFAULT_CHMI_DATA_PATH,
 ) -> DataFrame[pa_models.CHMIDailyDataFrame]:
     """Load historical weather data from ČHMÚ"""
-    excel_data = pd.ExcelFile(path)
+    excel_data = _open_chmi_excel(path)
 
     # Read all sheets but the first one
+    # (calamine parses a whole sheet in one fast call, threads would not help here:
+    # a workbook cannot be read from several threads at once)
     extracted_sheets = [
         extract_and_clean_chmi_excel_sheet(excel_data, sheet_name)
         for sheet_name in excel_data.sheet_names[1:]
     ]
+    # All sheets cover (nearly) the same dates, align them on the union of the dates
+    # instead of the general outer join of pd.concat(axis=1)
+    full_index = reduce(pd.Index.union, (sheet.index for sheet in extracted_sheets))
     result = (
-        pd.concat(extracted_sheets, axis=1)
+        pd.DataFrame(
+            {
+                sheet.columns[0]: sheet.iloc[:, 0].reindex(full_index)
+                for sheet in extracted_sheets
+            },
+            index=full_index,
+        )
         .rename(columns=CZ_EN_TRANSLATION)
         .rename(columns=lambda c: c.replace(" ", "_"))
     )
     return result.set_index(result.index.tz_localize("Europe/Prague"))
 
 
-def extract_and_clean_chmi_excel_sheet(
-    excel_data: pd.ExcelFile, sheet_name: int | str
+def _open_chmi_excel(path: str | pathlib.Path) -> CalamineWorkbook:
+    """Open the workbook with python-calamine, bypassing the pandas Excel reader"""
+    return CalamineWorkbook.from_path(str(path))
+
+
+# All ČHMÚ sheets share the same layout: year, month and a column per day of month
+CHMI_DAY_COLUMNS = [f"{day}." for day in range(1, 32)]
+CHMI_DATE_DTYPES = {"rok": "int16", "měsíc": "int8"}
+
+
+def _parse_chmi_sheet(
+    workbook: CalamineWorkbook, sheet_name: int | str
 ) -> pd.DataFrame:
-    """Parse ČHMÚ historical meteo excel data"""
-    data_tidy = (
-        excel_data.parse(sheet_name, skiprows=3)
-        .melt(id_vars=["rok", "měsíc"], var_name="den", value_name=sheet_name)
-        .dropna()
+    """Read the year, month and day columns of a ČHMÚ sheet
+
+    calamine returns the whole sheet as a list of rows in a single call,
+    the frame is built directly instead of going through the pandas Excel parser.
+    """
+    if isinstance(sheet_name, int):
+        sheet = workbook.get_sheet_by_index(sheet_name)
+    else:
+        sheet = workbook.get_sheet_by_name(sheet_name)
+    # The first three rows are the sheet description, the fourth is the header
+    header, *rows = sheet.to_python(skip_empty_area=True)[3:]
+
+    # calamine represents empty cells as empty strings
+    cells = np.asarray(
+        [row for row in rows if any(value != "" for value in row)], dtype=object
     )
-    dates = pd.to_datetime(
-        data_tidy[["rok", "měsíc", "den"]].rename(
-            columns={"rok": "year", "měsíc": "month", "den": "day"}
+    cells[cells == ""] = np.nan
+    columns = {name: i for i, name in enumerate(header)}
+    # Values keep their inferred dtype (float64), any unexpected content is left
+    # for the pandera validation of the output to report
+    return (
+        pd.DataFrame(
+            {
+                name: cells[:, columns[name]]
+                for name in [*CHMI_DATE_DTYPES, *CHMI_DAY_COLUMNS]
+            }
         )
+        .infer_objects()
+        .astype(CHMI_DATE_DTYPES)
     )
+
+
+def extract_and_clean_chmi_excel_sheet(
+    excel_data: CalamineWorkbook, sheet_name: int | str
+) -> pd.DataFrame:
+    """Parse ČHMÚ historical meteo excel data"""
+    data_wide = _parse_chmi_sheet(excel_data, sheet_name)
+    years = data_wide["rok"].to_numpy("int64")
+    months = data_wide["měsíc"].to_numpy("int64")
+    values = data_wide[CHMI_DAY_COLUMNS].to_numpy()
+
+    # Build the (month, day) grid of dates directly instead of melting the frame
+    month_start = ((years - 1970) * 12 + months - 1).astype("datetime64[M]")
+    next_month_start = (month_start + 1).astype("datetime64[D]")
+    dates = month_start.astype("datetime64[D]")[:, None] + np.arange(
+        len(CHMI_DAY_COLUMNS)
+    ).astype("timedelta64[D]")
+    # Drop missing values and non-existent days such as 30th February
+    mask = ~pd.isna(values) & (dates < next_month_start[:, None])
+
     return (
-        data_tidy.assign(date=dates)
-        .set_index("date")
-        .drop(columns=["rok", "měsíc", "den"])
+        pd.DataFrame(
+            {sheet_name: values[mask]},
+            index=pd.DatetimeIndex(dates[mask].astype("datetime64[ns]"), name="date"),
+        )
+        .infer_objects()
         .sort_index()
     )
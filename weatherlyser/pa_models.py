@@ -1,64 +1,125 @@
+import inspect
+import os
+from functools import wraps
+from typing import Annotated, Any, Callable, Optional, ParamSpec, TypeVar
+
+import numpy as np
+import pandas as pd
 import pandera as pa
 from pandera.typing import Index, Series
-from typing import Annotated, Optional
-import pandas as pd
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Runtime validation can be switched off for trusted data, either via
+# WEATHERLYSER_VALIDATE=0 or by setting `pa_models.VALIDATE = False` in a notebook.
+VALIDATE = os.getenv("WEATHERLYSER_VALIDATE", "1") == "1"
+
+
+def _gated(func: Callable[P, T], checked: Callable[P, T]) -> Callable[P, T]:
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        return (checked if VALIDATE else func)(*args, **kwargs)
+
+    # pandera resolves argument names via getfullargspec, which ignores __wrapped__
+    wrapper.__signature__ = inspect.signature(func)  # type: ignore[attr-defined]
+    return wrapper
+
+
+def maybe_check_types(func: Callable[P, T]) -> Callable[P, T]:
+    """`pa.check_types` that is skipped when validation is disabled"""
+    return _gated(func, pa.check_types(func))
+
+
+def maybe_check_input(
+    schema: Any, obj_getter: int | str | None = None
+) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """`pa.check_input` that is skipped when validation is disabled"""
+
+    def decorator(func: Callable[P, T]) -> Callable[P, T]:
+        return _gated(func, pa.check_input(schema, obj_getter)(func))
+
+    return decorator
+
+
+def maybe_check_output(schema: Any) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """`pa.check_output` that is skipped when validation is disabled"""
+
+    def decorator(func: Callable[P, T]) -> Callable[P, T]:
+        return _gated(func, pa.check_output(schema)(func))
+
+    return decorator
 
 
 class HistoricalWeatherDataFrame(pa.DataFrameModel):
-    apparent_temperature: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    cloudcover: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    cloudcover_high: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    cloudcover_low: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    cloudcover_mid: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    dewpoint_2m: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    diffuse_radiation: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    direct_normal_irradiance: Optional[Series[float]] = pa.Field(
+    apparent_temperature: Optional[Series[np.float32]] = pa.Field(
+        nullable=True, coerce=True
+    )
+    cloudcover: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    cloudcover_high: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    cloudcover_low: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    cloudcover_mid: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    dewpoint_2m: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    diffuse_radiation: Optional[Series[np.float32]] = pa.Field(
+        nullable=True, coerce=True
+    )
+    direct_normal_irradiance: Optional[Series[np.float32]] = pa.Field(
+        nullable=True, coerce=True
+    )
+    direct_radiation: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
-    direct_radiation: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    et0_fao_evapotranspiration: Optional[Series[float]] = pa.Field(
+    et0_fao_evapotranspiration: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
-    precipitation: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    pressure_msl: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    rain: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    relativehumidity_2m: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    shortwave_radiation: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    snowfall: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    soil_moisture_0_to_7cm: Optional[Series[float]] = pa.Field(
+    precipitation: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    pressure_msl: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    rain: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    relativehumidity_2m: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
-    soil_moisture_100_to_255cm: Optional[Series[float]] = pa.Field(
+    shortwave_radiation: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
-    soil_moisture_28_to_100cm: Optional[Series[float]] = pa.Field(
+    snowfall: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    soil_moisture_0_to_7cm: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
-    soil_moisture_7_to_28cm: Optional[Series[float]] = pa.Field(
+    soil_moisture_100_to_255cm: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
-    soil_temperature_0_to_7cm: Optional[Series[float]] = pa.Field(
+    soil_moisture_28_to_100cm: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
-    soil_temperature_100_to_255cm: Optional[Series[float]] = pa.Field(
+    soil_moisture_7_to_28cm: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
-    soil_temperature_28_to_100cm: Optional[Series[float]] = pa.Field(
+    soil_temperature_0_to_7cm: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
-    soil_temperature_7_to_28cm: Optional[Series[float]] = pa.Field(
+    soil_temperature_100_to_255cm: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
-    temperature_2m: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    vapor_pressure_deficit: Optional[Series[float]] = pa.Field(
+    soil_temperature_28_to_100cm: Optional[Series[np.float32]] = pa.Field(
+        nullable=True, coerce=True
+    )
+    soil_temperature_7_to_28cm: Optional[Series[np.float32]] = pa.Field(
+        nullable=True, coerce=True
+    )
+    temperature_2m: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    vapor_pressure_deficit: Optional[Series[np.float32]] = pa.Field(
         nullable=True, coerce=True
     )
     weathercode: Optional[Series[pd.Int16Dtype]] = pa.Field(nullable=True, coerce=True)
-    winddirection_100m: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    winddirection_10m: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    windgusts_10m: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    windspeed_100m: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
-    windspeed_10m: Optional[Series[float]] = pa.Field(nullable=True, coerce=True)
+    winddirection_100m: Optional[Series[np.float32]] = pa.Field(
+        nullable=True, coerce=True
+    )
+    winddirection_10m: Optional[Series[np.float32]] = pa.Field(
+        nullable=True, coerce=True
+    )
+    windgusts_10m: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    windspeed_100m: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
+    windspeed_10m: Optional[Series[np.float32]] = pa.Field(nullable=True, coerce=True)
     is_day: Optional[Series[bool]] = pa.Field(nullable=True, coerce=True)
 
     time: Index[Annotated[pd.DatetimeTZDtype, "ns", "UTC"]]
@@ -1,12 +1,14 @@
 from collections.abc import Iterable
 import datetime as dt
+import re
 from dateutil.relativedelta import relativedelta
+import numpy as np
 import pandas as pd
 import pandera as pa
 from pandera.typing import DataFrame
 
 from weatherlyser import api_models, pa_models
-from weatherlyser.loader import load_open_meteo_archive_data
+from weatherlyser.loader import load_open_meteo_archive_data_batch
 
 
 # Exercise: write a pa schema for get_seasons output
@@ -24,15 +26,29 @@ seasons_series_schema = pa.SeriesSchema(
 )
 
 
-@pa.check_output(seasons_series_schema)
+# Season name for each month number (index 0 is not a month, i.e. missing)
+# fmt: off
+_MONTH_TO_SEASON = np.array(
+    [
+        None,
+        "winter", "winter",
+        "spring", "spring", "spring",
+        "summer", "summer", "summer",
+        "autumn", "autumn", "autumn",
+        "winter",
+    ],
+    dtype=object,
+)
+# fmt: on
+
+
+@pa_models.maybe_check_output(seasons_series_schema)
 def get_seasons(time_index: pd.DatetimeIndex) -> pd.Series:
     """Returns a series the meteorological seasons for the given time index."""
-    seasons = pd.Series(index=time_index, dtype="string")
-    seasons.loc[time_index.month.isin([12, 1, 2])] = "winter"
-    seasons.loc[time_index.month.isin([3, 4, 5])] = "spring"
-    seasons.loc[time_index.month.isin([6, 7, 8])] = "summer"
-    seasons.loc[time_index.month.isin([9, 10, 11])] = "autumn"
-    return seasons
+    # Extract the months only once, int8 is plenty for 1-12
+    # NaT has no month (NaN), it becomes 0 and hence a missing season the schema rejects
+    months = np.where(time_index.isna(), 0, time_index.month).astype(np.int8)
+    return pd.Series(_MONTH_TO_SEASON[months], index=time_index, dtype="string")
 
 
 def open_meteo_response_to_dataframe(
@@ -47,7 +63,20 @@ def open_meteo_response_to_dataframe(
     elif tz is None:
         tz = dt.timezone(dt.timedelta(seconds=data.utc_offset_seconds))
 
-    df = pd.DataFrame(data.hourly)
+    if data.hourly is None:
+        raise ValueError("hourly is None - the response contains no hourly data")
+
+    # Measured quantities are stored as float32 right away, half the memory of float64
+    df = pd.DataFrame(
+        {
+            name: (
+                values
+                if _is_extra_or_time_column(name)
+                else np.asarray(values, dtype="float32")
+            )
+            for name, values in data.hourly.items()
+        }
+    )
     df = df.assign(
         time=pd.to_datetime(df["time"]).dt.tz_localize(
             # explict tz like Europe/Prague can actually cause an issue
@@ -58,6 +87,14 @@ def open_meteo_response_to_dataframe(
     return df
 
 
+def _is_extra_or_time_column(name: str) -> bool:
+    # without models, the API returns the bare quantity names (e.g. is_day)
+    return name == "time" or any(
+        name == quantity or name.startswith(f"{quantity}_")
+        for quantity in _open_meteo_df_schema_extra_columns_types
+    )
+
+
 # Exercise solution:
 
 _open_meteo_df_schema_extra_columns_types = {
@@ -78,7 +115,7 @@ open_meteo_df_schema = pa.DataFrameSchema(
             + "|".join(model.name for model in api_models.HistoryModelsEnum)
             + ")$"
         ): pa.Column(
-            float,
+            np.float32,
             regex=True,
             nullable=True,
             coerce=True,
@@ -107,31 +144,59 @@ open_meteo_df_schema = open_meteo_df_schema.add_columns(
 # https://pandera.readthedocs.io/en/stable/extensions.html#specifying-a-check-strategy
 
 
+# Wide Open Meteo columns are named <quantity>_<model>
+_OM_PATTERN_STR = (
+    "^("
+    + "|".join(variable.name for variable in api_models.HourlyEnum)
+    + ")_("
+    + "|".join(model.name for model in api_models.HistoryModelsEnum)
+    + ")$"
+)
+_OM_PATTERN_RE = re.compile(_OM_PATTERN_STR)
+
+
 # TODO: Loading does not work for me with this
-@pa.check_input(open_meteo_df_schema, "df")
-@pa.check_types
+@pa_models.maybe_check_input(open_meteo_df_schema, "df")
+@pa_models.maybe_check_types
 def tidy_open_meteo_dataframe(
     df: pd.DataFrame,
 ) -> DataFrame[pa_models.HistoricalWeatherDataFrame]:
     # *** This would be a good task
-    pattern = (
-        "^("
-        + "|".join(variable.name for variable in api_models.HourlyEnum)
-        + ")_("
-        + "|".join(model.name for model in api_models.HistoryModelsEnum)
-        + ")$"
-    )
     # check that all columns match the pattern
     # Exercise: make this a pandera check
-    if not df.columns.str.match(pattern).all():
+    if pa_models.VALIDATE and not all(_OM_PATTERN_RE.match(c) for c in df.columns):
         raise ValueError(
-            f"Unexpected columns in the dataframe: {df.columns[~df.columns.str.match(pattern)].to_list()}"
+            f"Unexpected columns in the dataframe: {[c for c in df.columns if not _OM_PATTERN_RE.match(c)]}"
         )
     new_columns = pd.MultiIndex.from_frame(
-        df.columns.str.extract(pattern, expand=True), names=["quantity", "model"]
+        df.columns.str.extract(_OM_PATTERN_RE, expand=True), names=["quantity", "model"]
     )
-    result = df.set_axis(new_columns, axis="columns").stack(level="model")
-    return result
+    wide = df.set_axis(new_columns, axis="columns")
+    models = sorted(new_columns.unique(level="model"))
+    quantities = sorted(new_columns.unique(level="quantity"))
+
+    # Equivalent of .stack(level="model"): each (time x model) block of a quantity
+    # is flattened row by row, which matches the (time, model) product index
+    result = pd.DataFrame(
+        {
+            quantity: _flatten_block(wide[quantity].reindex(columns=models))
+            for quantity in quantities
+        },
+        index=pd.MultiIndex.from_product([df.index, models], names=["time", "model"]),
+    )
+    # stack drops the rows without any data as well
+    return result.rename_axis(columns="quantity").dropna(how="all")
+
+
+def _flatten_block(
+    block: pd.DataFrame,
+) -> pd.api.extensions.ExtensionArray | np.ndarray:
+    """Flatten a 2D block in row-major order, keeping its dtype if it is uniform"""
+    values = block.to_numpy().ravel()
+    dtypes = block.dtypes.unique()
+    if len(dtypes) == 1 and isinstance(dtypes[0], pd.api.extensions.ExtensionDtype):
+        return pd.array(values, dtype=dtypes[0])
+    return values
 
 
 def _create_archive_query_parameters(
@@ -195,7 +260,7 @@ DEFAULT_FIELDS = [
 ]
 
 
-@pa.check_types
+@pa_models.maybe_check_types
 def get_open_meteo_data(
     start_date: str | dt.date | pd.Timestamp,
     end_date: str | dt.date | pd.Timestamp,
@@ -214,21 +279,29 @@ def get_open_meteo_data(
     ) + dt.timedelta(days=1)
     chunk_end = start_timestamp
 
-    chunk_dfs = []
+    # Prepare all the queries upfront so that they can be requested concurrently
+    chunk_queries = []
     while (chunk_start := chunk_end) < end_timestamp:
         chunk_end = min(chunk_start + chunk_size, end_timestamp)
-        query_parameters = _create_archive_query_parameters(
-            start_date=chunk_start,
-            end_date=chunk_end,
-            latitude=latitude,
-            longitude=longitude,
-            models=models,
-            fields=fields,
+        chunk_queries.append(
+            _create_archive_query_parameters(
+                start_date=chunk_start,
+                end_date=chunk_end,
+                latitude=latitude,
+                longitude=longitude,
+                models=models,
+                fields=fields,
+            )
         )
-        response = load_open_meteo_archive_data(query_parameters)
+
+    chunk_dfs = []
+    for response in load_open_meteo_archive_data_batch(chunk_queries):
         original_df = open_meteo_response_to_dataframe(response)
         tidy_df = tidy_open_meteo_dataframe(original_df)
         chunk_dfs.append(tidy_df)
 
+    # Chunks overlap at their boundaries, duplicates are identified by (time, model) only
+    result = pd.concat(chunk_dfs, axis="rows")
+    result = result[~result.index.duplicated(keep="first")].sort_index()
     # The limits are somewhat fuzzy & overlapping, use the logic used by pandas
-    return pd.concat(chunk_dfs, axis="rows").drop_duplicates().loc[start_date:end_date]  # type: ignore
+    return result.loc[start_date:end_date]  # type: ignore